@@ -4,12 +4,13 @@ from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import uvicorn
 
+# Load environment variables (before the routers, whose caches read them at import)
+load_dotenv()
+
 # Import routers
 from src.seismic_data.las_router import router as las_router
 from src.seismic_data.segy_router import router as segy_router
-
-# Load environment variables
-load_dotenv()
+from src.seismic_data.segy_stream_router import router as segy_stream_router
 
 # Create FastAPI app
 app = FastAPI(
@@ -25,11 +26,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified"],
 )
 
 # Include routers
 app.include_router(las_router, prefix="/api/seismic-data/las", tags=["LAS Files"])
 app.include_router(segy_router, prefix="/api/seismic-data/segy", tags=["SEGY Files"])
+app.include_router(segy_stream_router, prefix="/api/seismic-data/segy", tags=["SEGY Streaming"])
 
 @app.get("/")
 async def root():
@@ -39,13 +42,55 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+def run_production(host: str, port: int, workers: int, timeout: int):
+    """
+    Run N worker processes without reload. The app is preloaded in a gunicorn
+    master and forked into uvicorn workers. gunicorn is POSIX-only, so on
+    Windows fall back to uvicorn's own process manager, which imports the app
+    in each worker. Workers share decoded panels through the on-disk panel
+    cache. timeout (seconds) is how long gunicorn lets a worker stay silent
+    before restarting it, and how long workers get to finish on shutdown.
+    """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        uvicorn.run(
+            "app-seismic-data:app",
+            host=host,
+            port=port,
+            workers=workers,
+            reload=False,
+            timeout_graceful_shutdown=timeout
+        )
+        return
+
+    class SeismicDataApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("worker_class", "uvicorn.workers.UvicornWorker")
+            self.cfg.set("preload_app", True)
+            self.cfg.set("timeout", timeout)
+            self.cfg.set("graceful_timeout", timeout)
+
+        def load(self):
+            return app
+
+    SeismicDataApplication().run()
+
 if __name__ == "__main__":
     host = os.getenv("HOST_SEISMIC_DATA", "127.0.0.1")
     port = int(os.getenv("PORT_SEISMIC_DATA", 8051))
+    mode = os.getenv("MODE_SEISMIC_DATA", "development")
+    workers = int(os.getenv("WORKERS_SEISMIC_DATA", os.cpu_count() or 1))
+    timeout = int(os.getenv("TIMEOUT_SEISMIC_DATA", 120))
     
-    uvicorn.run(
-        "app-seismic-data:app",
-        host=host,
-        port=port,
-        reload=True
-    )
\ No newline at end of file
+    if mode == "production":
+        run_production(host, port, workers, timeout)
+    else:
+        uvicorn.run(
+            "app-seismic-data:app",
+            host=host,
+            port=port,
+            reload=True
+        )
\ No newline at end of file
@@ -0,0 +1,88 @@
+import hashlib
+import json
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi import Request, Response
+
+# Clients and proxies may store responses but must revalidate them with the
+# ETag / Last-Modified validators before reuse
+CACHE_CONTROL = "public, no-cache"
+
+
+def compute_validators(paths: Iterable[Path], params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Compute an ETag and Last-Modified value from the files a response depends
+    on (mtime, size) and the request parameters that shaped it
+    """
+    digest = hashlib.sha1()
+    last_modified = 0.0
+
+    for path in paths:
+        stat = path.stat()
+        digest.update(f"{path.name}:{stat.st_mtime_ns}:{stat.st_size};".encode("utf-8"))
+        last_modified = max(last_modified, stat.st_mtime)
+
+    if params:
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+
+    return {
+        "etag": f'"{digest.hexdigest()}"',
+        "last_modified": last_modified,
+    }
+
+
+def cache_headers(validators: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Build the response headers for a set of validators
+    """
+    return {
+        "ETag": validators["etag"],
+        "Last-Modified": formatdate(validators["last_modified"], usegmt=True),
+        "Cache-Control": CACHE_CONTROL,
+    }
+
+
+def is_not_modified(request: Request, validators: Dict[str, Any]) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since (RFC 9110 section 13.2.2).
+    If-Modified-Since is only considered when If-None-Match is absent.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        etag = validators["etag"]
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate.startswith("W/"):
+                candidate = candidate[2:]
+            if candidate == etag:
+                return True
+        return False
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one second resolution
+        return int(validators["last_modified"]) <= since
+
+    return False
+
+
+def conditional_response(request: Request, response: Response, validators: Dict[str, Any]) -> Optional[Response]:
+    """
+    Return a 304 response if the client copy is still fresh, otherwise attach
+    the validators to the outgoing response and return None
+    """
+    headers = cache_headers(validators)
+
+    if is_not_modified(request, validators):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
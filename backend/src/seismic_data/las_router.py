@@ -2,10 +2,12 @@ import json
 import os
 import numpy as np
 from typing import List, Dict, Any, Optional
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from pydantic import BaseModel
 from pathlib import Path
 
+from .http_cache import compute_validators, cache_headers, conditional_response
+
 # Try to import lasio
 try:
     import lasio
@@ -32,10 +34,9 @@ class LasResponse(BaseModel):
     data: Dict[str, List[Optional[float]]]  # Dictionary with curve names as keys, allowing None values
     headers: Optional[List[Optional[float]]] = None  # Optional: depth/time values, allowing None values
 
-@router.get("/list", response_model=List[Dict[str, Any]])
-async def get_las_list():
+def _load_las_list() -> List[Dict[str, Any]]:
     """
-    Get the list of LAS files from las-list.json
+    Load the list of LAS files from las-list.json
     """
     try:
         if not LAS_LIST_FILE.exists():
@@ -60,16 +61,33 @@ async def get_las_list():
             detail=f"Error reading LAS list: {str(e)}"
         )
 
+@router.get("/list", response_model=List[Dict[str, Any]])
+async def get_las_list(request: Request, response: Response):
+    """
+    Get the list of LAS files from las-list.json
+    """
+    las_list = _load_las_list()
+
+    not_modified = conditional_response(request, response, compute_validators([LAS_LIST_FILE]))
+    if not_modified:
+        return not_modified
+
+    return las_list
+
 @router.get("/list/{file_name}")
-async def get_las_file_info(file_name: str):
+async def get_las_file_info(file_name: str, request: Request, response: Response):
     """
     Get information about a specific LAS file
     """
     try:
-        las_list = await get_las_list()
+        las_list = _load_las_list()
         
         for las_file in las_list:
             if las_file.get("name") == file_name:
+                validators = compute_validators([LAS_LIST_FILE], {"name": file_name})
+                not_modified = conditional_response(request, response, validators)
+                if not_modified:
+                    return not_modified
                 return las_file
         
         raise HTTPException(
@@ -86,25 +104,104 @@ async def get_las_file_info(file_name: str):
         )
 
 @router.get("/count")
-async def get_las_count():
+async def get_las_count(request: Request, response: Response):
     """
     Get the total count of LAS files
     """
     try:
-        las_list = await get_las_list()
+        las_list = _load_las_list()
+
+        validators = compute_validators([LAS_LIST_FILE], {"count": True})
+        not_modified = conditional_response(request, response, validators)
+        if not_modified:
+            return not_modified
+
         return {"count": len(las_list)}
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, 
             detail=f"Error counting LAS files: {str(e)}"
         )
 
+def _resolve_las_file(filename: str):
+    """
+    Resolve a LAS filename to its path and its entry in las-list.json
+    """
+    file_path = LAS_DATA_DIR / filename
+
+    if not file_path.exists():
+        raise HTTPException(
+            status_code=404,
+            detail=f"LAS file '{filename}' not found in {LAS_DATA_DIR}"
+        )
+
+    # Get file info from the list
+    file_info = None
+    for las_file in _load_las_list():
+        if las_file.get("name") == filename:
+            file_info = las_file
+            break
+
+    if not file_info:
+        raise HTTPException(
+            status_code=404,
+            detail=f"LAS file '{filename}' not found in the file list"
+        )
+
+    return file_path, file_info
+
+def _read_validators(request: LasFileRequest, file_path: Path) -> Dict[str, Any]:
+    """
+    Validators for a read response: the LAS file, the list entry embedded in
+    the response and every request parameter
+    """
+    return compute_validators([file_path, LAS_LIST_FILE], request.model_dump())
+
 @router.post("/read", response_model=LasResponse)
-async def read_las_file(request: LasFileRequest):
+async def read_las_file(request: LasFileRequest, response: Response):
     """
     Read a LAS file and return its info and data
     """
+    file_path, file_info = _resolve_las_file(request.filename)
+    result = _read_las(request, file_path, file_info)
+
+    response.headers.update(cache_headers(_read_validators(request, file_path)))
+    return result
+
+@router.get("/read", response_model=LasResponse)
+async def read_las_file_get(
+    http_request: Request,
+    response: Response,
+    filename: str,
+    maxDepth: Optional[int] = None,
+    dtMultiplier: int = 1,
+    curves: Optional[List[str]] = Query(None),
+):
+    """
+    Read a LAS file with the parameters in the query string, so the result can
+    be cached by browsers and reverse proxies and revalidated with a 304
+    """
+    request = LasFileRequest(
+        filename=filename,
+        maxDepth=maxDepth,
+        dtMultiplier=dtMultiplier,
+        curves=curves,
+    )
+    file_path, file_info = _resolve_las_file(request.filename)
+
+    not_modified = conditional_response(http_request, response, _read_validators(request, file_path))
+    if not_modified:
+        return not_modified
+
+    return _read_las(request, file_path, file_info)
+
+def _read_las(request: LasFileRequest, file_path: Path, file_info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Read a LAS file and build the read response
+    """
     if not LASIO_AVAILABLE:
         raise HTTPException(
             status_code=500,
@@ -112,29 +209,6 @@ async def read_las_file(request: LasFileRequest):
         )
     
     try:
-        # Construct the file path
-        file_path = LAS_DATA_DIR / request.filename
-        
-        if not file_path.exists():
-            raise HTTPException(
-                status_code=404,
-                detail=f"LAS file '{request.filename}' not found in {LAS_DATA_DIR}"
-            )
-        
-        # Get file info from the list
-        las_list = await get_las_list()
-        file_info = None
-        for las_file in las_list:
-            if las_file.get("name") == request.filename:
-                file_info = las_file
-                break
-        
-        if not file_info:
-            raise HTTPException(
-                status_code=404,
-                detail=f"LAS file '{request.filename}' not found in the file list"
-            )
-        
         # Read LAS file using lasio
         las = lasio.read(str(file_path))
         
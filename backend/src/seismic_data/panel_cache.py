@@ -0,0 +1,202 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+# Memory budget of the per-process panel cache, in MB
+PANEL_CACHE_MB = int(os.getenv("SEGY_PANEL_CACHE_MB", 256))
+
+BASE_DIR = Path(__file__).parent.parent.parent
+
+# Shared on-disk tier, used by every worker process. Enabled by default only in
+# production mode, where several workers run; SEGY_CACHE_DISK_MB=0 disables it.
+PRODUCTION_MODE = os.getenv("MODE_SEISMIC_DATA", "development") == "production"
+CACHE_DIR = Path(os.getenv("SEGY_CACHE_DIR", BASE_DIR / ".cache" / "panels"))
+CACHE_DISK_MB = int(os.getenv("SEGY_CACHE_DISK_MB", 2048 if PRODUCTION_MODE else 0))
+
+# Prune the disk tier every N writes of this process
+PRUNE_EVERY = 32
+
+logger = logging.getLogger(__name__)
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Build a cache key from JSON-serializable parts
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """
+    Cross-process cache of NumPy arrays stored as .npy files. Writes go to a
+    temporary file renamed into place, so readers never see partial files.
+    Reads are memory-mapped: all workers share the page cache copy.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._checked = False
+
+    @property
+    def enabled(self) -> bool:
+        if self.max_bytes <= 0:
+            return False
+        if not self._checked:
+            with self._lock:
+                if not self._checked:
+                    if not self._prepare_directory():
+                        self.max_bytes = 0
+                    self._checked = True
+        return self.max_bytes > 0
+
+    def _prepare_directory(self) -> bool:
+        """
+        Create the cache directory private to the server user (0700) and
+        refuse it if another user owns it or can write to it, since its files
+        are served as decoded panels
+        """
+        try:
+            self.directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+            stat = self.directory.stat()
+        except OSError as e:
+            logger.warning("Disk panel cache disabled, cannot create %s: %s", self.directory, e)
+            return False
+
+        if hasattr(os, "geteuid"):
+            if stat.st_uid != os.geteuid():
+                logger.warning("Disk panel cache disabled, %s is not owned by the server user", self.directory)
+                return False
+            if stat.st_mode & 0o077:
+                try:
+                    os.chmod(self.directory, 0o700)
+                except OSError as e:
+                    logger.warning("Disk panel cache disabled, cannot restrict %s: %s", self.directory, e)
+                    return False
+        return True
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.npy"
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            value = np.load(path, mmap_mode="r")
+            # Refresh the mtime so pruning evicts the least recently used
+            os.utime(path)
+            return value
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+
+    def put(self, key: str, value: np.ndarray) -> Optional[np.ndarray]:
+        if not self.enabled or value.nbytes > self.max_bytes:
+            return None
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as file:
+                    np.save(file, np.ascontiguousarray(value))
+                os.replace(temp_path, self._path(key))
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError:
+            return None
+
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+
+        return self.get(key)
+
+    def prune(self) -> None:
+        """
+        Delete least recently used entries until the tier fits its budget.
+        Files still mapped by another worker stay valid until unmapped.
+        """
+        entries = []
+        for path in self.directory.glob("*.npy"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                continue
+
+
+class PanelCache:
+    """
+    Two-tier cache of NumPy arrays: a thread-safe LRU in process memory,
+    bounded by total bytes, in front of the shared on-disk tier
+    """
+
+    def __init__(self, max_bytes: int, disk: Optional[DiskCache] = None):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.disk = disk
+        self._items: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+                return value
+
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: np.ndarray) -> None:
+        if self.disk is not None:
+            # Keep the memory-mapped copy so this process shares pages with
+            # the other workers instead of holding a private one
+            shared = self.disk.put(key, value)
+            if shared is not None:
+                value = shared
+        self._remember(key, value)
+
+    def _remember(self, key: str, value: np.ndarray) -> None:
+        if value.nbytes > self.max_bytes:
+            return
+        # Cached arrays are shared between requests
+        value.setflags(write=False)
+        with self._lock:
+            previous = self._items.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous.nbytes
+            self._items[key] = value
+            self.current_bytes += value.nbytes
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+
+
+panel_cache = PanelCache(PANEL_CACHE_MB * 1024 * 1024, DiskCache(CACHE_DIR, CACHE_DISK_MB * 1024 * 1024))
@@ -0,0 +1,210 @@
+import json
+import hashlib
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Literal, Optional
+
+import numpy as np
+from fastapi import HTTPException
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+# Try to import scipy (needed for bandpass only)
+try:
+    from scipy import signal
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+# Traces per chunk when a chain runs in parallel, and number of worker threads.
+# NumPy and SciPy release the GIL inside their loops, so threads use all cores.
+CHUNK_TRACES = 256
+PROCESSING_WORKERS = int(os.getenv("SEGY_PROCESSING_WORKERS", os.cpu_count() or 1))
+
+# An IIR filter's impulse response is considered finished once it stays
+# below this fraction of its peak
+IIR_TOLERANCE = 1e-6
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+# Pydantic models
+class ProcessingStep(BaseModel):
+    op: Literal["agc", "gain", "bandpass", "normalize"]
+    window: Optional[float] = None  # agc: window length in ms (default 500)
+    power: Optional[float] = None  # gain: amplitude * t^power, t in seconds from the recording delay (default 2)
+    low: Optional[float] = None  # bandpass: low cut in Hz
+    high: Optional[float] = None  # bandpass: high cut in Hz
+    order: int = 4  # bandpass: Butterworth order
+    mode: Optional[Literal["max", "rms"]] = None  # normalize: per-trace scaling (default "max")
+
+def parse_processing_query(value: Optional[str]) -> Optional[List[ProcessingStep]]:
+    """
+    Parse a processing chain passed as a JSON array in a query string
+    """
+    if not value:
+        return None
+    try:
+        return TypeAdapter(List[ProcessingStep]).validate_json(value)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid processing chain: {str(e)}")
+
+def chain_key(chain: Optional[List[ProcessingStep]]) -> Optional[str]:
+    """
+    Stable hash of a processing chain, used in cache keys
+    """
+    if not chain:
+        return None
+    payload = json.dumps([step.model_dump() for step in chain], sort_keys=True)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def validate_chain(chain: List[ProcessingStep], dt_ms: float) -> None:
+    """
+    Check step parameters against the sample interval before processing
+    """
+    nyquist = 500.0 / dt_ms
+    for step in chain:
+        if step.op == "agc" and step.window is not None and step.window <= 0:
+            raise HTTPException(status_code=422, detail="agc window must be > 0 ms")
+        if step.op == "gain" and step.power is not None and step.power < 0:
+            raise HTTPException(status_code=422, detail="gain power must be >= 0")
+        if step.op == "bandpass":
+            if not SCIPY_AVAILABLE:
+                raise HTTPException(
+                    status_code=500,
+                    detail="scipy library not available. Please install it to apply a bandpass filter."
+                )
+            if step.low is None and step.high is None:
+                raise HTTPException(status_code=422, detail="bandpass needs low and/or high cut frequency")
+            if (step.low is not None and step.low <= 0) or (step.high is not None and step.high <= 0):
+                raise HTTPException(
+                    status_code=422,
+                    detail="bandpass cut frequencies must be > 0 Hz (omit low for a lowpass, high for a highpass)"
+                )
+            low = step.low if step.low is not None else 0.0
+            high = step.high if step.high is not None else nyquist
+            if (step.high is not None and step.high >= nyquist) or low >= high:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"bandpass cut frequencies must satisfy 0 < low < high < {nyquist:g} Hz"
+                )
+            if step.order < 1:
+                raise HTTPException(status_code=422, detail="bandpass order must be >= 1")
+
+def needs_full_trace(chain: Optional[List[ProcessingStep]]) -> bool:
+    """
+    True when a step depends on the whole trace (normalize scales by the
+    max/rms of the full trace), so a sample window plus halo is not enough
+    """
+    return any(step.op == "normalize" for step in chain or [])
+
+def _design_filter(step: ProcessingStep, dt_ms: float) -> np.ndarray:
+    fs = 1000.0 / dt_ms
+    if step.low is not None and step.high is not None:
+        return signal.butter(step.order, [step.low, step.high], btype="bandpass", fs=fs, output="sos")
+    if step.low is not None:
+        return signal.butter(step.order, step.low, btype="highpass", fs=fs, output="sos")
+    return signal.butter(step.order, step.high, btype="lowpass", fs=fs, output="sos")
+
+@lru_cache(maxsize=64)
+def _filter_halo(order: int, low: Optional[float], high: Optional[float], dt_ms: float) -> int:
+    """
+    Length in samples of the filter's impulse response, down to IIR_TOLERANCE
+    of its peak
+    """
+    step = ProcessingStep(op="bandpass", order=order, low=low, high=high)
+    lowest = min(f for f in (low, high) if f is not None)
+    length = max(int(math.ceil(50 * 1000.0 / lowest / dt_ms)), 64)
+
+    impulse = np.zeros(length)
+    impulse[0] = 1.0
+    response = np.abs(signal.sosfilt(_design_filter(step, dt_ms), impulse))
+    significant = np.nonzero(response > IIR_TOLERANCE * response.max())[0]
+    return int(significant[-1]) + 1
+
+def halo_samples(chain: Optional[List[ProcessingStep]], dt_ms: float) -> int:
+    """
+    Extra samples to read on each side of a window so windowed operators
+    (AGC, filters) give the same result as over the full trace. Each step
+    needs its own context on top of the context of the steps after it, so
+    the halos add up.
+    """
+    halo = 0
+    for step in chain or []:
+        if step.op == "agc":
+            halo += max(int(round((step.window or 500.0) / dt_ms / 2)), 1)
+        elif step.op == "bandpass" and SCIPY_AVAILABLE:
+            halo += _filter_halo(step.order, step.low, step.high, dt_ms)
+    return halo
+
+def _agc(block: np.ndarray, window_ms: float, dt_ms: float) -> np.ndarray:
+    nsp = block.shape[1]
+    half = max(int(round(window_ms / dt_ms / 2)), 1)
+
+    # Sliding-window RMS from a cumulative sum of the energy
+    energy = np.zeros((block.shape[0], nsp + 1))
+    np.cumsum(block * block, axis=1, out=energy[:, 1:])
+    index = np.arange(nsp)
+    lo = np.clip(index - half, 0, nsp)
+    hi = np.clip(index + half + 1, 0, nsp)
+    rms = np.sqrt((energy[:, hi] - energy[:, lo]) / (hi - lo))
+
+    return np.divide(block, rms, out=np.zeros_like(block), where=rms > 0)
+
+def _gain(block: np.ndarray, power: float, dt_ms: float, sample_offset: int, t0_ms: float) -> np.ndarray:
+    # Real sample times: recording delay plus sample index, clipped at time zero
+    t = (t0_ms + (sample_offset + np.arange(block.shape[1])) * dt_ms) / 1000.0
+    return block * np.maximum(t, 0.0) ** power
+
+def _bandpass(block: np.ndarray, step: ProcessingStep, dt_ms: float) -> np.ndarray:
+    sos = _design_filter(step, dt_ms)
+
+    if block.shape[1] < 2:
+        return block
+    padlen = min(3 * (2 * len(sos) + 1), block.shape[1] - 1)
+    return signal.sosfiltfilt(sos, block, axis=1, padlen=padlen)
+
+def _normalize(block: np.ndarray, mode: str) -> np.ndarray:
+    if mode == "rms":
+        scale = np.sqrt(np.mean(block * block, axis=1, keepdims=True))
+    else:
+        scale = np.max(np.abs(block), axis=1, keepdims=True)
+    return np.divide(block, scale, out=np.zeros_like(block), where=scale > 0)
+
+def _apply_chunk(block: np.ndarray, chain: List[ProcessingStep], dt_ms: float, sample_offset: int,
+                 t0_ms: float) -> np.ndarray:
+    data = np.nan_to_num(block.astype(np.float64), nan=0.0, posinf=0.0, neginf=0.0)
+    for step in chain:
+        if step.op == "agc":
+            data = _agc(data, step.window or 500.0, dt_ms)
+        elif step.op == "gain":
+            data = _gain(data, 2.0 if step.power is None else step.power, dt_ms, sample_offset, t0_ms)
+        elif step.op == "bandpass":
+            data = _bandpass(data, step, dt_ms)
+        elif step.op == "normalize":
+            data = _normalize(data, step.mode or "max")
+    return data.astype(np.float32)
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=PROCESSING_WORKERS, thread_name_prefix="segy-processing")
+    return _executor
+
+def apply_processing(block: np.ndarray, chain: List[ProcessingStep], dt_ms: float, sample_offset: int = 0,
+                     t0_ms: float = 0.0) -> np.ndarray:
+    """
+    Apply a processing chain to a (traces, samples) block whose first column
+    is sample sample_offset of traces starting at t0_ms (the recording
+    delay). Every step works along the sample axis, so large blocks are split
+    into trace chunks that are processed in parallel.
+    """
+    validate_chain(chain, dt_ms)
+    block = np.atleast_2d(block)
+
+    if PROCESSING_WORKERS <= 1 or block.shape[0] <= CHUNK_TRACES:
+        return _apply_chunk(block, chain, dt_ms, sample_offset, t0_ms)
+
+    chunks = [block[start:start + CHUNK_TRACES] for start in range(0, block.shape[0], CHUNK_TRACES)]
+    results = _get_executor().map(lambda chunk: _apply_chunk(chunk, chain, dt_ms, sample_offset, t0_ms), chunks)
+    return np.concatenate(list(results), axis=0)
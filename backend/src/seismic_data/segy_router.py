@@ -2,10 +2,16 @@ import json
 import os
 import numpy as np
 from typing import List, Dict, Any, Optional
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from pathlib import Path
 
+from .http_cache import compute_validators, cache_headers, conditional_response, is_not_modified
+from .panel_cache import make_key, panel_cache
+from .segy_processing import ProcessingStep, apply_processing, chain_key, parse_processing_query
+
 # Try to import segyio
 try:
     import segyio
@@ -20,22 +26,63 @@ BASE_DIR = Path(__file__).parent.parent.parent
 SEGY_LIST_FILE = BASE_DIR / "file_data" / "segy-list.json"
 SEGY_DATA_DIR = BASE_DIR / "file_data" / "segy"
 
+# SEG-Y layout constants (bytes)
+TEXTUAL_HEADER_SIZE = 3200
+BINARY_HEADER_SIZE = 400
+TRACE_HEADER_SIZE = 240
+
+# Bytes per sample for each SEG-Y data sample format code
+SAMPLE_FORMAT_BYTES = {
+    1: 4,   # 4-byte IBM float
+    2: 4,   # 4-byte two's complement integer
+    3: 2,   # 2-byte two's complement integer
+    5: 4,   # 4-byte IEEE float
+    6: 8,   # 8-byte IEEE float
+    8: 1,   # 1-byte two's complement integer
+    9: 8,   # 8-byte two's complement integer
+    10: 4,  # 4-byte unsigned integer
+    11: 2,  # 2-byte unsigned integer
+    12: 8,  # 8-byte unsigned integer
+    16: 1,  # 1-byte unsigned integer
+}
+
+# Binary header byte offsets used to detect the byte order
+FORMAT_CODE_OFFSET = TEXTUAL_HEADER_SIZE + 24  # Bytes 3225-3226: data sample format code
+ENDIAN_CONSTANT_OFFSET = TEXTUAL_HEADER_SIZE + 96  # Bytes 3297-3300 (rev 2): 0x01020304
+
 # Pydantic models
 class SegyFileRequest(BaseModel):
     filename: str
     maxNtrc: Optional[int] = None  # Optional: limit number of traces
     dtMultiplier: int = 1  # Optional: sampling multiplier (default 1 = no spacing)
     header: Optional[str] = None  # Optional: header field to extract (e.g., "cdp", "inline", "xline")
+    processing: Optional[List[ProcessingStep]] = None  # Optional: display processing chain (agc, gain, bandpass, normalize)
+
+class SegyLayoutResponse(BaseModel):
+    info: Dict[str, Any]
+    textualHeader: str
+    binaryHeader: Dict[str, int]
+    endian: str
+    sampleFormat: int
+    bytesPerSample: int
+    nsp: int
+    ntrc: int
+    extendedTextualHeaders: int
+    traceHeaderLength: int
+    traceLength: int  # Trace header + samples, in bytes
+    firstTraceOffset: int  # Byte offset of trace 0; trace i starts at firstTraceOffset + i * traceLength
+    fileSize: int
+    fixedLength: bool  # True when the file size matches the computed layout
+    traceOffsets: Optional[List[int]] = None  # Optional: explicit byte offset of every trace, only when fixedLength
 
 class SegyResponse(BaseModel):
     info: Dict[str, Any]
     data: List[List[Optional[float]]]  # Allow None values in trace data
     headers: Optional[List[Optional[Any]]] = None  # Optional: header values if requested, allowing None values
 
-@router.get("/list", response_model=List[Dict[str, Any]])
-async def get_segy_list():
+def _load_segy_list() -> List[Dict[str, Any]]:
     """
-    Get the list of SEGY files from segy-list.json
+    Load the list of SEGY files from segy-list.json
     """
     try:
         if not SEGY_LIST_FILE.exists():
@@ -60,16 +107,33 @@ async def get_segy_list():
             detail=f"Error reading SEGY list: {str(e)}"
         )
 
+@router.get("/list", response_model=List[Dict[str, Any]])
+async def get_segy_list(request: Request, response: Response):
+    """
+    Get the list of SEGY files from segy-list.json
+    """
+    segy_list = _load_segy_list()
+
+    not_modified = conditional_response(request, response, compute_validators([SEGY_LIST_FILE]))
+    if not_modified:
+        return not_modified
+
+    return segy_list
+
 @router.get("/list/{file_name}")
-async def get_segy_file_info(file_name: str):
+async def get_segy_file_info(file_name: str, request: Request, response: Response):
     """
     Get information about a specific SEGY file
     """
     try:
-        segy_list = await get_segy_list()
+        segy_list = _load_segy_list()
         
         for segy_file in segy_list:
             if segy_file.get("name") == file_name:
+                validators = compute_validators([SEGY_LIST_FILE], {"name": file_name})
+                not_modified = conditional_response(request, response, validators)
+                if not_modified:
+                    return not_modified
                 return segy_file
         
         raise HTTPException(
@@ -86,25 +150,186 @@ async def get_segy_file_info(file_name: str):
         )
 
 @router.get("/count")
-async def get_segy_count():
+async def get_segy_count(request: Request, response: Response):
     """
     Get the total count of SEGY files
     """
     try:
-        segy_list = await get_segy_list()
+        segy_list = _load_segy_list()
+
+        validators = compute_validators([SEGY_LIST_FILE], {"count": True})
+        not_modified = conditional_response(request, response, validators)
+        if not_modified:
+            return not_modified
+
         return {"count": len(segy_list)}
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, 
             detail=f"Error counting SEGY files: {str(e)}"
         )
 
+def _resolve_segy_file(filename: str):
+    """
+    Resolve a SEGY filename to its path and its entry in segy-list.json
+    """
+    file_path = SEGY_DATA_DIR / filename
+
+    if not file_path.exists():
+        raise HTTPException(
+            status_code=404,
+            detail=f"SEGY file '{filename}' not found in {SEGY_DATA_DIR}"
+        )
+
+    # Get file info from the list
+    file_info = None
+    for segy_file in _load_segy_list():
+        if segy_file.get("name") == filename:
+            file_info = segy_file
+            break
+
+    if not file_info:
+        raise HTTPException(
+            status_code=404,
+            detail=f"SEGY file '{filename}' not found in the file list"
+        )
+
+    return file_path, file_info
+
+def _read_validators(request: SegyFileRequest, file_path: Path) -> Dict[str, Any]:
+    """
+    Validators for a read response: the SEGY file, the list entry embedded in
+    the response and every request parameter
+    """
+    return compute_validators([file_path, SEGY_LIST_FILE], request.model_dump())
+
 @router.post("/read", response_model=SegyResponse)
-async def read_segy_file(request: SegyFileRequest):
+async def read_segy_file(request: SegyFileRequest, response: Response):
     """
     Read a SEGY file and return its info and data
     """
+    file_path, file_info = _resolve_segy_file(request.filename)
+    # Decoding, processing and formatting are CPU bound, keep them off the event loop
+    result = await run_in_threadpool(_read_segy, request, file_path, file_info)
+
+    response.headers.update(cache_headers(_read_validators(request, file_path)))
+    return result
+
+@router.get("/read", response_model=SegyResponse)
+async def read_segy_file_get(
+    http_request: Request,
+    response: Response,
+    filename: str,
+    maxNtrc: Optional[int] = None,
+    dtMultiplier: int = 1,
+    header: Optional[str] = None,
+    processing: Optional[str] = None,
+):
+    """
+    Read a SEGY file with the parameters in the query string, so the panel can
+    be cached by browsers and reverse proxies and revalidated with a 304.
+    The processing chain is passed as a JSON array.
+    """
+    request = SegyFileRequest(
+        filename=filename,
+        maxNtrc=maxNtrc,
+        dtMultiplier=dtMultiplier,
+        header=header,
+        processing=parse_processing_query(processing),
+    )
+    file_path, file_info = _resolve_segy_file(request.filename)
+
+    not_modified = conditional_response(http_request, response, _read_validators(request, file_path))
+    if not_modified:
+        return not_modified
+
+    return await run_in_threadpool(_read_segy, request, file_path, file_info)
+
+def segy_dt_ms(segy, file_info: Dict[str, Any]) -> float:
+    """
+    Sample interval in ms, from the file headers or the list entry
+    """
+    return segyio.tools.dt(segy, fallback_dt=float(file_info.get("dt") or 4.0) * 1000) / 1000
+
+def detect_endian(file_path: Path) -> str:
+    """
+    Byte order of a SEGY file: the rev 2 endianness constant when present,
+    otherwise whichever reading of the sample format code is valid.
+    Defaults to big-endian (rev 0/1).
+    """
+    with open(file_path, 'rb') as file:
+        file.seek(TEXTUAL_HEADER_SIZE)
+        binary_header = file.read(BINARY_HEADER_SIZE)
+
+    if len(binary_header) < BINARY_HEADER_SIZE:
+        return "big"
+
+    constant = binary_header[ENDIAN_CONSTANT_OFFSET - TEXTUAL_HEADER_SIZE:ENDIAN_CONSTANT_OFFSET - TEXTUAL_HEADER_SIZE + 4]
+    if constant == b'\x01\x02\x03\x04':
+        return "big"
+    if constant == b'\x04\x03\x02\x01':
+        return "little"
+
+    format_code = binary_header[FORMAT_CODE_OFFSET - TEXTUAL_HEADER_SIZE:FORMAT_CODE_OFFSET - TEXTUAL_HEADER_SIZE + 2]
+    if int.from_bytes(format_code, 'big') not in SAMPLE_FORMAT_BYTES \
+            and int.from_bytes(format_code, 'little') in SAMPLE_FORMAT_BYTES:
+        return "little"
+    return "big"
+
+def open_segy(file_path: Path, **kwargs):
+    """
+    Open a SEGY file with segyio in its detected byte order
+    """
+    return segyio.open(str(file_path), 'r', strict=False, endian=detect_endian(file_path), **kwargs)
+
+def _file_version(file_path: Path) -> str:
+    return compute_validators([file_path])["etag"]
+
+def _decoded_traces(segy, file_path: Path, num_traces: int) -> np.ndarray:
+    """
+    Decode the first num_traces traces into a (traces, samples) array, shared
+    by all workers through the panel cache
+    """
+    key = make_key("decoded", file_path.name, _file_version(file_path), num_traces)
+    decoded = panel_cache.get(key)
+    if decoded is None:
+        decoded = np.atleast_2d(segy.trace.raw[0:num_traces])
+        panel_cache.put(key, decoded)
+    return decoded
+
+def _header_index(segy, file_path: Path, header_field) -> np.ndarray:
+    """
+    Values of one trace header field for every trace, shared by all workers
+    through the panel cache
+    """
+    key = make_key("header", file_path.name, _file_version(file_path), int(header_field))
+    values = panel_cache.get(key)
+    if values is None:
+        values = np.asarray(segy.attributes(header_field)[:])
+        panel_cache.put(key, values)
+    return values
+
+def _processed_traces(segy, file_path: Path, file_info: Dict[str, Any], num_traces: int,
+                      processing: List[ProcessingStep]) -> np.ndarray:
+    """
+    Apply the processing chain to the first num_traces traces at full sample
+    rate, cached by file version and chain hash
+    """
+    key = make_key("read", file_path.name, _file_version(file_path), num_traces, chain_key(processing))
+    processed = panel_cache.get(key)
+    if processed is None:
+        block = _decoded_traces(segy, file_path, num_traces)
+        processed = apply_processing(block, processing, segy_dt_ms(segy, file_info), t0_ms=float(segy.samples[0]))
+        panel_cache.put(key, processed)
+    return processed
+
+def _read_segy(request: SegyFileRequest, file_path: Path, file_info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Read a SEGY file and build the read response
+    """
     if not SEGYIO_AVAILABLE:
         raise HTTPException(
             status_code=500,
@@ -112,31 +337,8 @@ async def read_segy_file(request: SegyFileRequest):
         )
     
     try:
-        # Construct the file path
-        file_path = SEGY_DATA_DIR / request.filename
-        
-        if not file_path.exists():
-            raise HTTPException(
-                status_code=404,
-                detail=f"SEGY file '{request.filename}' not found in {SEGY_DATA_DIR}"
-            )
-        
-        # Get file info from the list
-        segy_list = await get_segy_list()
-        file_info = None
-        for segy_file in segy_list:
-            if segy_file.get("name") == request.filename:
-                file_info = segy_file
-                break
-        
-        if not file_info:
-            raise HTTPException(
-                status_code=404,
-                detail=f"SEGY file '{request.filename}' not found in the file list"
-            )
-        
         # Read SEGY file using segyio
-        with segyio.open(str(file_path), 'r', strict=False) as segy:
+        with open_segy(file_path) as segy:
             # Determine number of traces to read
             total_traces = len(segy.trace)
             max_traces = request.maxNtrc if request.maxNtrc is not None else total_traces
@@ -147,43 +349,41 @@ async def read_segy_file(request: SegyFileRequest):
             data = []
             headers = []  # To store header values if requested
             
-            # Read each trace up to the limit
-            for trace_num in range(num_traces_to_read):
-                trace_data = segy.trace[trace_num]
-                
-                # Extract header information if requested, or use default sequential numbering
-                if request.header:
-                    try:
-                        # Get trace header
-                        trace_header = segy.header[trace_num]
-                        
-                        # Map common header names to segyio fields
-                        header_field_map = {
-                            "ffid": segyio.TraceField.FieldRecord,
-                            "sp": segyio.TraceField.EnergySourcePoint,
-                            "cdp": segyio.TraceField.CDP,
-                            "inline": segyio.TraceField.INLINE_3D,
-                            "xline": segyio.TraceField.CROSSLINE_3D,
-                            "offset": segyio.TraceField.offset,
-                            "elevation": segyio.TraceField.ReceiverGroupElevation,
-                            "traceno": segyio.TraceField.TRACE_SEQUENCE_LINE
-                        }
-                        
-                        header_field = header_field_map.get(request.header.lower())
-                        if header_field:
-                            header_value = trace_header[header_field]
-                            headers.append(header_value)
-                        else:
-                            headers.append(None)
-                    except Exception as e:
-                        headers.append(None)
-                else:
-                    # When no header parameter is given, use sequential numbering [1, 2, 3, ...]
-                    headers.append(trace_num + 1)
+            # Extract header information if requested, or use default sequential numbering
+            if request.header:
+                try:
+                    # Map common header names to segyio fields
+                    header_field_map = {
+                        "ffid": segyio.TraceField.FieldRecord,
+                        "sp": segyio.TraceField.EnergySourcePoint,
+                        "cdp": segyio.TraceField.CDP,
+                        "inline": segyio.TraceField.INLINE_3D,
+                        "xline": segyio.TraceField.CROSSLINE_3D,
+                        "offset": segyio.TraceField.offset,
+                        "elevation": segyio.TraceField.ReceiverGroupElevation,
+                        "traceno": segyio.TraceField.TRACE_SEQUENCE_LINE
+                    }
+                    
+                    header_field = header_field_map.get(request.header.lower())
+                    if header_field:
+                        headers = _header_index(segy, file_path, header_field)[:num_traces_to_read].tolist()
+                    else:
+                        headers = [None] * num_traces_to_read
+                except Exception as e:
+                    headers = [None] * num_traces_to_read
+            else:
+                # When no header parameter is given, use sequential numbering [1, 2, 3, ...]
+                headers = list(range(1, num_traces_to_read + 1))
             
+            # Display processing runs on the full-rate window, before decimation and formatting
+            if request.processing:
+                traces = _processed_traces(segy, file_path, file_info, num_traces_to_read, request.processing)
+            else:
+                traces = _decoded_traces(segy, file_path, num_traces_to_read)
+
             # Read each trace up to the limit
             for trace_num in range(num_traces_to_read):
-                trace_data = segy.trace[trace_num]
+                trace_data = traces[trace_num]
                 
                 # Apply dtMultiplier sampling (every nth sample)
                 if request.dtMultiplier > 1:
@@ -225,4 +425,103 @@ async def read_segy_file(request: SegyFileRequest):
         raise HTTPException(
             status_code=500,
             detail=f"Error reading SEGY file: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+def _read_segy_layout(file_path: Path, file_info: Dict[str, Any], include_offsets: bool) -> Dict[str, Any]:
+    """
+    Describe the byte layout of a SEGY file so clients can decode raw traces.
+    The byte order is detected from the binary header (big-endian rev 0/1 or
+    little-endian rev 2) and reported in "endian". The layout assumes
+    fixed-length traces (nsp from the binary header); when the file size does
+    not match, fixedLength is False and no trace offsets are returned.
+    """
+    if not SEGYIO_AVAILABLE:
+        raise HTTPException(
+            status_code=500,
+            detail="segyio library not available. Please install it to read SEGY files."
+        )
+
+    try:
+        endian = detect_endian(file_path)
+        with segyio.open(str(file_path), 'r', strict=False, ignore_geometry=True, endian=endian) as segy:
+            sample_format = int(segy.bin[segyio.BinField.Format])
+            bytes_per_sample = SAMPLE_FORMAT_BYTES.get(sample_format)
+            if bytes_per_sample is None:
+                raise HTTPException(
+                    status_code=422,
+                    detail=f"Unsupported SEGY sample format code {sample_format}"
+                )
+
+            nsp = len(segy.samples)
+            ntrc = len(segy.trace)
+            extended_headers = int(segy.ext_headers)
+            textual_header = segyio.tools.wrap(bytes(segy.text[0]).decode('ascii', errors='replace'))
+            binary_header = {str(field): int(value) for field, value in segy.bin.items()}
+
+        trace_length = TRACE_HEADER_SIZE + nsp * bytes_per_sample
+        first_trace_offset = TEXTUAL_HEADER_SIZE + BINARY_HEADER_SIZE + extended_headers * TEXTUAL_HEADER_SIZE
+        file_size = file_path.stat().st_size
+
+        layout = {
+            "info": file_info,
+            "textualHeader": textual_header,
+            "binaryHeader": binary_header,
+            "endian": endian,
+            "sampleFormat": sample_format,
+            "bytesPerSample": bytes_per_sample,
+            "nsp": nsp,
+            "ntrc": ntrc,
+            "extendedTextualHeaders": extended_headers,
+            "traceHeaderLength": TRACE_HEADER_SIZE,
+            "traceLength": trace_length,
+            "firstTraceOffset": first_trace_offset,
+            "fileSize": file_size,
+            "fixedLength": first_trace_offset + ntrc * trace_length == file_size,
+        }
+
+        if include_offsets and layout["fixedLength"]:
+            offsets = first_trace_offset + np.arange(ntrc, dtype=np.int64) * trace_length
+            layout["traceOffsets"] = offsets.tolist()
+
+        return layout
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error reading SEGY layout: {str(e)}"
+        )
+
+@router.get("/layout/{file_name}", response_model=SegyLayoutResponse)
+async def get_segy_layout(file_name: str, request: Request, response: Response, includeOffsets: bool = False):
+    """
+    Get the byte layout of a SEGY file: textual/binary header, sample format,
+    trace length and trace byte offsets, for decoding data fetched from /raw.
+    Offsets assume fixed-length traces and are omitted when fixedLength is False.
+    """
+    file_path, file_info = _resolve_segy_file(file_name)
+
+    validators = compute_validators([file_path, SEGY_LIST_FILE], {"layout": True, "includeOffsets": includeOffsets})
+    not_modified = conditional_response(request, response, validators)
+    if not_modified:
+        return not_modified
+
+    return _read_segy_layout(file_path, file_info, includeOffsets)
+
+@router.api_route("/raw/{file_name}", methods=["GET", "HEAD"])
+async def get_segy_raw(file_name: str, request: Request):
+    """
+    Serve the raw SEGY file with HTTP Range support (single and multiple
+    ranges, If-Range). Traces [a, b) are the range "bytes=<start>-<end>"
+    with, from /layout,
+    start = firstTraceOffset + a * traceLength and
+    end = firstTraceOffset + b * traceLength - 1
+    """
+    file_path, _ = _resolve_segy_file(file_name)
+    validators = compute_validators([file_path])
+
+    if is_not_modified(request, validators):
+        return Response(status_code=304, headers=cache_headers(validators))
+
+    return FileResponse(file_path, headers=cache_headers(validators), media_type="application/octet-stream")
@@ -0,0 +1,361 @@
+import asyncio
+import json
+import threading
+import time
+import numpy as np
+from typing import List, Dict, Any, Optional, Set, Tuple
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException
+from pydantic import BaseModel, ValidationError
+
+from .segy_router import SEGYIO_AVAILABLE, _resolve_segy_file, open_segy, segy_dt_ms
+from .http_cache import compute_validators
+from .panel_cache import make_key, panel_cache
+from .segy_processing import ProcessingStep, apply_processing, chain_key, halo_samples, needs_full_trace, validate_chain
+
+router = APIRouter()
+
+# Tile grid: traces per tile and (decimated) samples per tile
+TILE_TRACES = 64
+TILE_SAMPLES = 512
+
+# Pydantic models
+class SegyViewportRequest(BaseModel):
+    filename: str
+    traceStart: int = 0
+    traceEnd: Optional[int] = None  # Exclusive, default: last trace
+    sampleStart: int = 0
+    sampleEnd: Optional[int] = None  # Exclusive, default: last sample
+    dtMultiplier: int = 1  # Resolution: keep every nth sample
+    processing: Optional[List[ProcessingStep]] = None  # Optional: display processing chain
+
+def format_block(block: np.ndarray) -> List[List[Optional[float]]]:
+    """
+    Round a 2D block to 4 significant digits (same values as read_segy_file)
+    and convert it to nested lists with None for non-finite values
+    """
+    values = np.asarray(block, dtype=np.float64)
+    finite = np.isfinite(values)
+    nonzero = finite & (values != 0)
+
+    exponent = np.zeros_like(values)
+    exponent[nonzero] = np.floor(np.log10(np.abs(values[nonzero]))) - 3
+
+    # Scale by an exact power of ten on either side so the rounded values
+    # serialize as short decimals
+    rounded = np.where(finite, values, 0.0)
+    small = nonzero & (exponent < 0)
+    large = nonzero & (exponent >= 0)
+    scale = 10.0 ** -exponent[small]
+    rounded[small] = np.round(rounded[small] * scale) / scale
+    step = 10.0 ** exponent[large]
+    rounded[large] = np.round(rounded[large] / step) * step
+
+    result = rounded.astype(object)
+    result[~finite] = None
+    return result.tolist()
+
+class SegyStreamSession:
+    """
+    State of one WebSocket streaming session: the open SEGY handle, the tiles
+    already delivered to the client, the in-flight viewport task and
+    throughput counters
+    """
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.segy = None
+        self.filename: Optional[str] = None
+        self.file_info: Dict[str, Any] = {}
+        self.ntrc = 0
+        self.nsp = 0
+        self.dt_ms = 0.0
+        self.t0_ms = 0.0
+        self.file_version: Optional[str] = None
+        self.sent_tiles: Set[Tuple[int, int, int, Optional[str]]] = set()
+        self.viewport_id = 0
+        self.task: Optional[asyncio.Task] = None
+        # segyio handles are not thread safe and a cancelled read may still be
+        # running in its worker thread
+        self.io_lock = threading.Lock()
+
+        self.started = time.perf_counter()
+        self.bytes_sent = 0
+        self.tiles_sent = 0
+        self.viewports = 0
+        self.cancelled = 0
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        text = json.dumps(message)
+        await self.websocket.send_text(text)
+        self.bytes_sent += len(text)
+
+    def stats(self) -> Dict[str, Any]:
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        return {
+            "type": "stats",
+            "elapsed": round(elapsed, 3),
+            "viewports": self.viewports,
+            "cancelled": self.cancelled,
+            "tilesSent": self.tiles_sent,
+            "bytesSent": self.bytes_sent,
+            "tilesPerSecond": round(self.tiles_sent / elapsed, 2),
+            "mbPerSecond": round(self.bytes_sent / elapsed / (1024 * 1024), 3),
+        }
+
+    def _open(self, filename: str) -> None:
+        file_path, file_info = _resolve_segy_file(filename)
+        with self.io_lock:
+            self._close_handle()
+            self.segy = open_segy(file_path, ignore_geometry=True)
+            self.filename = filename
+            self.file_info = file_info
+            self.ntrc = len(self.segy.trace)
+            self.nsp = len(self.segy.samples)
+            self.dt_ms = segy_dt_ms(self.segy, file_info)
+            self.t0_ms = float(self.segy.samples[0])
+            self.file_version = compute_validators([file_path])["etag"]
+            self.sent_tiles = set()
+
+    def _close_handle(self) -> None:
+        if self.segy is not None:
+            self.segy.close()
+            self.segy = None
+
+    def _close_locked(self) -> None:
+        with self.io_lock:
+            self._close_handle()
+
+    async def close(self) -> None:
+        # Wait for an in-flight read in a worker thread, not on the event loop
+        await self.cancel_task()
+        await asyncio.to_thread(self._close_locked)
+
+    def _read_window(self, trace_start: int, trace_end: int, sample_start: int, sample_end: int,
+                     step: int = 1) -> np.ndarray:
+        """
+        Read and decode only samples [sample_start, sample_end) with the given
+        step for traces [trace_start, trace_end)
+        """
+        num_samples = len(range(sample_start, sample_end, step))
+        block = np.empty((trace_end - trace_start, num_samples), dtype=np.float32)
+        with self.io_lock:
+            # segyio reuses its trace buffer, so copy each trace into the block
+            for index, trace in enumerate(self.segy.trace[trace_start:trace_end, sample_start:sample_end:step]):
+                block[index] = trace
+        return block
+
+    def _read_tile(self, trace_start: int, trace_end: int, sample_start: int, sample_end: int, dt_multiplier: int,
+                   processing: Optional[List[ProcessingStep]]):
+        if processing and needs_full_trace(processing):
+            # Whole-trace steps (normalize) run once per trace tile on the
+            # full traces; every sample tile is cropped from that result
+            key = make_key("tile", self.filename, self.file_version, trace_start, trace_end,
+                           None, None, chain_key(processing))
+            processed = panel_cache.get(key)
+            if processed is None:
+                block = self._read_window(trace_start, trace_end, 0, self.nsp)
+                processed = apply_processing(block, processing, self.dt_ms, t0_ms=self.t0_ms)
+                panel_cache.put(key, processed)
+            return format_block(processed[:, sample_start:sample_end:dt_multiplier])
+
+        if processing:
+            # Process the full-rate tile plus a halo so windowed operators
+            # match across tile borders, then crop and decimate
+            key = make_key("tile", self.filename, self.file_version, trace_start, trace_end,
+                           sample_start, sample_end, chain_key(processing))
+            processed = panel_cache.get(key)
+            if processed is None:
+                halo = halo_samples(processing, self.dt_ms)
+                window_start = max(sample_start - halo, 0)
+                window_end = min(sample_end + halo, self.nsp)
+                block = self._read_window(trace_start, trace_end, window_start, window_end)
+                processed = apply_processing(block, processing, self.dt_ms, window_start, self.t0_ms)
+                processed = processed[:, sample_start - window_start:sample_end - window_start]
+                panel_cache.put(key, processed)
+            return format_block(processed[:, ::dt_multiplier])
+
+        return format_block(self._read_window(trace_start, trace_end, sample_start, sample_end, dt_multiplier))
+
+    def tiles_for(self, viewport: SegyViewportRequest) -> List[Tuple[int, int, int, Optional[str]]]:
+        """
+        Tile keys (trace tile, sample tile, dtMultiplier, chain hash or None)
+        covering a viewport
+        """
+        trace_end = min(viewport.traceEnd if viewport.traceEnd is not None else self.ntrc, self.ntrc)
+        sample_end = min(viewport.sampleEnd if viewport.sampleEnd is not None else self.nsp, self.nsp)
+        trace_start = max(viewport.traceStart, 0)
+        sample_start = max(viewport.sampleStart, 0)
+        if trace_start >= trace_end or sample_start >= sample_end:
+            return []
+
+        tile_span = TILE_SAMPLES * viewport.dtMultiplier
+        processing_key = chain_key(viewport.processing)
+        return [
+            (trace_tile, sample_tile, viewport.dtMultiplier, processing_key)
+            for trace_tile in range(trace_start // TILE_TRACES, (trace_end - 1) // TILE_TRACES + 1)
+            for sample_tile in range(sample_start // tile_span, (sample_end - 1) // tile_span + 1)
+        ]
+
+    async def stream_viewport(self, viewport: SegyViewportRequest, viewport_id: int) -> None:
+        """
+        Send the tiles of a viewport the client does not have yet. Runs as a
+        task that is cancelled as soon as a newer viewport arrives.
+        """
+        started = time.perf_counter()
+        tiles = self.tiles_for(viewport)
+        missing = [tile for tile in tiles if tile not in self.sent_tiles]
+
+        try:
+            for trace_tile, sample_tile, dt_multiplier, processing_key in missing:
+                trace_start = trace_tile * TILE_TRACES
+                trace_end = min(trace_start + TILE_TRACES, self.ntrc)
+                sample_start = sample_tile * TILE_SAMPLES * dt_multiplier
+                sample_end = min(sample_start + TILE_SAMPLES * dt_multiplier, self.nsp)
+
+                data = await asyncio.to_thread(
+                    self._read_tile, trace_start, trace_end, sample_start, sample_end, dt_multiplier,
+                    viewport.processing
+                )
+                await self.send({
+                    "type": "tile",
+                    "viewport": viewport_id,
+                    "traceStart": trace_start,
+                    "traceEnd": trace_end,
+                    "sampleStart": sample_start,
+                    "sampleEnd": sample_end,
+                    "dtMultiplier": dt_multiplier,
+                    "processing": processing_key,
+                    "data": data,
+                })
+                self.sent_tiles.add((trace_tile, sample_tile, dt_multiplier, processing_key))
+                self.tiles_sent += 1
+
+            await self.send({
+                "type": "done",
+                "viewport": viewport_id,
+                "tiles": len(missing),
+                "cached": len(tiles) - len(missing),
+                "latency": round(time.perf_counter() - started, 4),
+            })
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            try:
+                await self.send({"type": "cancelled", "viewport": viewport_id})
+            except Exception:
+                # The socket is already closed when the session ends
+                pass
+            raise
+        except WebSocketDisconnect:
+            # Nothing left to report to
+            return
+        except Exception as e:
+            try:
+                await self.send({"type": "error", "viewport": viewport_id, "detail": f"Error streaming SEGY file: {str(e)}"})
+            except Exception:
+                # The failure was the socket itself
+                pass
+            return
+
+        await self.send(self.stats())
+
+    async def cancel_task(self) -> None:
+        if self.task is None:
+            return
+        if self.task.done():
+            # Retrieve a failure so asyncio does not log it as never retrieved
+            if not self.task.cancelled():
+                self.task.exception()
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+
+    async def handle_viewport(self, viewport: SegyViewportRequest) -> None:
+        await self.cancel_task()
+
+        if viewport.dtMultiplier < 1:
+            await self.send({"type": "error", "detail": "dtMultiplier must be >= 1"})
+            return
+
+        if viewport.filename != self.filename:
+            await asyncio.to_thread(self._open, viewport.filename)
+            await self.send({
+                "type": "info",
+                "info": self.file_info,
+                "ntrc": self.ntrc,
+                "nsp": self.nsp,
+                "tileTraces": TILE_TRACES,
+                "tileSamples": TILE_SAMPLES,
+            })
+
+        if viewport.processing:
+            validate_chain(viewport.processing, self.dt_ms)
+
+        self.viewports += 1
+        self.viewport_id += 1
+        self.task = asyncio.create_task(self.stream_viewport(viewport, self.viewport_id))
+
+@router.websocket("/stream")
+async def stream_segy(websocket: WebSocket):
+    """
+    Interactive pan/zoom session. The client sends messages
+
+        {"type": "viewport", "filename": ..., "traceStart": ..., "traceEnd": ...,
+         "sampleStart": ..., "sampleEnd": ..., "dtMultiplier": ...}
+        {"type": "reset"}   forget the tiles already delivered
+        {"type": "stats"}   request the session throughput
+
+    and receives "info", "tile", "done", "cancelled", "stats" and "error"
+    messages. A new viewport cancels the one still being streamed and only
+    tiles the client does not already have are sent.
+    """
+    await websocket.accept()
+
+    if not SEGYIO_AVAILABLE:
+        await websocket.send_json({
+            "type": "error",
+            "detail": "segyio library not available. Please install it to read SEGY files."
+        })
+        await websocket.close()
+        return
+
+    session = SegyStreamSession(websocket)
+    try:
+        while True:
+            text = await websocket.receive_text()
+
+            try:
+                try:
+                    message = json.loads(text)
+                except json.JSONDecodeError as e:
+                    await session.send({"type": "error", "detail": f"Invalid JSON message: {str(e)}"})
+                    continue
+                if not isinstance(message, dict):
+                    await session.send({"type": "error", "detail": "Message must be a JSON object"})
+                    continue
+
+                message_type = message.get("type", "viewport")
+                if message_type == "viewport":
+                    await session.handle_viewport(SegyViewportRequest(**message))
+                elif message_type == "reset":
+                    await session.cancel_task()
+                    session.sent_tiles = set()
+                elif message_type == "stats":
+                    await session.send(session.stats())
+                else:
+                    await session.send({"type": "error", "detail": f"Unknown message type '{message_type}'"})
+            except WebSocketDisconnect:
+                raise
+            except ValidationError as e:
+                await session.send({"type": "error", "detail": f"Invalid viewport: {str(e)}"})
+            except HTTPException as e:
+                await session.send({"type": "error", "detail": e.detail})
+            except Exception as e:
+                await session.send({"type": "error", "detail": f"Error streaming SEGY file: {str(e)}"})
+
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await session.close()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+SEGY Read Load Test
+
+This script starts the API in production mode with an increasing number of
+worker processes and measures the throughput of GET /api/seismic-data/segy/read
+for each worker count, to check that throughput scales with the workers.
+
+Requires: httpx (installed with fastapi[standard])
+
+Example:
+    python test/load_test_segy.py --file COP_Pharos-1_zstk.sgy --workers 1 2 4 8
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import httpx
+from pathlib import Path
+from typing import Dict, Any, List
+
+
+READ_URL = "/api/seismic-data/segy/read"
+
+
+def start_server(backend_dir: Path, host: str, port: int, workers: int) -> subprocess.Popen:
+    """Start the API in production mode with the given worker count."""
+    env = dict(os.environ)
+    env.update({
+        "HOST_SEISMIC_DATA": host,
+        "PORT_SEISMIC_DATA": str(port),
+        "MODE_SEISMIC_DATA": "production",
+        "WORKERS_SEISMIC_DATA": str(workers),
+    })
+    return subprocess.Popen(
+        [sys.executable, "app-seismic-data.py"],
+        cwd=str(backend_dir),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_for_server(base_url: str, timeout: float = 60.0):
+    """Wait until the health endpoint answers."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server at {base_url} did not start within {timeout} seconds")
+
+
+async def run_load(base_url: str, params: Dict[str, Any], concurrency: int, duration: float) -> Dict[str, Any]:
+    """Send read requests from concurrent clients for a fixed duration."""
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def client(session: httpx.AsyncClient):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await session.get(READ_URL, params=params)
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120.0) as session:
+        # Warm the shared panel cache before measuring
+        await session.get(READ_URL, params=params)
+        started = time.perf_counter()
+        await asyncio.gather(*(client(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed,
+        "p50": latencies[len(latencies) // 2] if latencies else 0.0,
+        "p95": latencies[int(len(latencies) * 0.95)] if latencies else 0.0,
+    }
+
+
+def main():
+    """Main function to run the load test for each worker count."""
+    parser = argparse.ArgumentParser(description="Load test the SEGY read endpoint")
+    parser.add_argument("--file", required=True, help="SEGY file name from segy-list.json")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts to test")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per worker count")
+    parser.add_argument("--dt-multiplier", type=int, default=4, help="dtMultiplier of the read request")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8061)
+    args = parser.parse_args()
+
+    backend_dir = Path(__file__).parent.parent
+    base_url = f"http://{args.host}:{args.port}"
+    params = {"filename": args.file, "dtMultiplier": args.dt_multiplier}
+
+    print(f"Load testing {READ_URL} with {args.file}, {args.concurrency} clients, {args.duration}s per run")
+    print(f"CPU cores: {os.cpu_count()}")
+
+    results = []
+    for workers in args.workers:
+        server = start_server(backend_dir, args.host, args.port, workers)
+        try:
+            wait_for_server(base_url)
+            result = asyncio.run(run_load(base_url, params, args.concurrency, args.duration))
+        finally:
+            server.terminate()
+            server.wait()
+        results.append((workers, result))
+        print(f"  - {workers} workers: {result['throughput']:.1f} req/s, "
+              f"p50 {result['p50'] * 1000:.0f} ms, p95 {result['p95'] * 1000:.0f} ms, "
+              f"{result['errors']} errors")
+
+    baseline = results[0][1]["throughput"] if results and results[0][1]["throughput"] > 0 else None
+    if baseline:
+        print("\nSpeedup vs first run:")
+        for workers, result in results:
+            print(f"  - {workers} workers: {result['throughput'] / baseline:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
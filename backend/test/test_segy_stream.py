@@ -0,0 +1,106 @@
+"""
+Streamed tiles must match GET /read for the same processing chain
+
+Run from the backend directory: python -m pytest test
+"""
+
+import importlib
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+segyio = pytest.importorskip("segyio")
+pytest.importorskip("scipy")
+from fastapi.testclient import TestClient
+
+from src.seismic_data import segy_router
+from src.seismic_data.segy_processing import ProcessingStep, halo_samples
+
+FILENAME = "stream_test.sgy"
+NTRC = 70
+NSP = 1600
+DT_US = 1000
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """App client serving one synthetic SEGY file from a temporary directory."""
+    rng = np.random.default_rng(0)
+    spec = segyio.spec()
+    spec.format = 5
+    spec.samples = range(NSP)
+    spec.tracecount = NTRC
+    spec.sorting = None
+    with segyio.create(str(tmp_path / FILENAME), spec) as segy:
+        for trace_num in range(NTRC):
+            ramp = np.linspace(1, 20, NSP)
+            segy.trace[trace_num] = (rng.standard_normal(NSP) * ramp).astype(np.float32)
+        segy.bin.update(hdt=DT_US)
+
+    list_file = tmp_path / "segy-list.json"
+    list_file.write_text(json.dumps([{"name": FILENAME, "ntrc": NTRC, "nsp": NSP, "dt": DT_US / 1000}]))
+    monkeypatch.setattr(segy_router, "SEGY_DATA_DIR", tmp_path)
+    monkeypatch.setattr(segy_router, "SEGY_LIST_FILE", list_file)
+
+    app = importlib.import_module("app-seismic-data").app
+    return TestClient(app)
+
+
+def read_panel(client, chain):
+    response = client.get("/api/seismic-data/segy/read", params={
+        "filename": FILENAME,
+        "processing": json.dumps(chain),
+    })
+    assert response.status_code == 200
+    return np.array(response.json()["data"])
+
+
+def stream_panel(client, chain):
+    panel = np.full((NTRC, NSP), np.nan)
+    with client.websocket_connect("/api/seismic-data/segy/stream") as websocket:
+        websocket.send_json({"type": "viewport", "filename": FILENAME, "dtMultiplier": 1, "processing": chain})
+        while True:
+            message = websocket.receive_json()
+            assert message["type"] != "error", message
+            if message["type"] == "tile":
+                panel[message["traceStart"]:message["traceEnd"],
+                      message["sampleStart"]:message["sampleEnd"]] = np.array(message["data"])
+            if message["type"] == "done":
+                break
+    return panel
+
+
+@pytest.mark.parametrize("chain", [
+    [{"op": "agc", "window": 200}, {"op": "bandpass", "low": 8, "high": 40}],
+    [{"op": "bandpass", "low": 5, "high": 60}],
+    [{"op": "bandpass", "low": 8, "high": 40}, {"op": "agc", "window": 100}, {"op": "gain", "power": 2}],
+    [{"op": "agc", "window": 300}, {"op": "normalize", "mode": "rms"}],
+])
+def test_streamed_tiles_match_read(client, chain):
+    full = read_panel(client, chain)
+    tiles = stream_panel(client, chain)
+
+    assert not np.isnan(tiles).any()
+    peak = np.abs(full).max()
+    # Both sides are rounded to 4 significant digits
+    np.testing.assert_allclose(tiles, full, rtol=1e-3, atol=1e-4 * peak)
+
+
+def test_halo_adds_up_over_steps():
+    agc = ProcessingStep(op="agc", window=200)
+    bandpass = ProcessingStep(op="bandpass", low=8, high=40)
+    assert halo_samples([agc, bandpass], 1.0) == halo_samples([agc], 1.0) + halo_samples([bandpass], 1.0)
+
+
+def test_negative_gain_power_is_rejected(client):
+    response = client.get("/api/seismic-data/segy/read", params={
+        "filename": FILENAME,
+        "processing": json.dumps([{"op": "gain", "power": -1}]),
+    })
+    assert response.status_code == 422
@@ -86,7 +86,8 @@ function App() {
           })
         }, 100)
 
-        const requestBody = {
+        // Query string parameters keep the panel URL cacheable (ETag / 304)
+        const requestParams = {
           filename,
           ...(maxNtrc && { maxNtrc }),
           ...(dtMultiplier && { dtMultiplier }),
@@ -94,9 +95,9 @@ function App() {
         }
 
         const response = await fetchApi({
-          method: 'POST',
+          method: 'GET',
           url: AppApi.seismicData.segyRead,
-          body: requestBody,
+          params: requestParams,
         })
 
         clearInterval(progressInterval)